@@ -6,10 +6,25 @@ import argparse
 import configparser
 import logging
 from abc import ABC, abstractmethod
-from datetime import datetime
+from functools import lru_cache, reduce
 from itertools import product
-from os import path, chdir
-from typing import Sequence, Tuple
+from operator import mul
+from os import path, chdir, scandir
+from typing import Iterable, Tuple
+
+
+@lru_cache(maxsize=32)
+def _load_config(filename: str, mtime: float) -> configparser.ConfigParser:
+	"""
+	Parse a settings file. Memoized on (filename, mtime) so repeated Job constructions don't re-read and re-parse an
+	unchanged file.
+	:param str   filename: Path to the settings file
+	:param float mtime:    Modification time of the settings file (cache key)
+	"""
+	config = configparser.ConfigParser(converters={'list': str.split})
+	config.optionxform = str  # Use case-sensitive keys
+	config.read(filename)
+	return config
 
 
 class Job(ABC):
@@ -37,17 +52,14 @@ class Job(ABC):
 			raise RuntimeError("Subdir '{}' does not exist.".format(self.args.subdir))
 		chdir(self.args.subdir)
 
-		# Setup logging
-		logging.basicConfig(level=logging.INFO, handlers=[logging.FileHandler("wrapper.log"), logging.StreamHandler()])
-
-		# Setup parser
-		config = configparser.ConfigParser(converters={'list': lambda s: s.split()})
-		config.optionxform = str  # Use case-sensitive keys
+		# Setup logging. The formatter timestamps records lazily, only when they are emitted
+		logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s',
+		                    handlers=[logging.FileHandler("wrapper.log"), logging.StreamHandler()])
 
 		# Assert that settings file exist and parse it
 		if not path.isfile('settings.ini'):
 			raise RuntimeError("settings.ini does not exist in specified subdir {}".format(self.args.subdir))
-		config.read('settings.ini')
+		config = _load_config(path.abspath('settings.ini'), path.getmtime('settings.ini'))
 
 		# Assert that input file exists
 		input_file = '../' + config['job']['input_file']
@@ -59,10 +71,23 @@ class Job(ABC):
 		dyn_data_files = config['dyn_vars'].getlist('initial_data_file')
 		data_files = dyn_data_files if dyn_data_files else [static_data_file]
 		if not self.args.skip_data_file_check:
-			for data_file in data_files:
-				if not path.isfile(path.expanduser(config['job'].get('initial_data_file_prefix') + data_file)):
-					raise RuntimeError("Missing initial data file: {}"
-					                   .format(config['job'].get('initial_data_file_prefix') + data_file))
+			data_file_paths = [path.expanduser(config['job'].get('initial_data_file_prefix') + data_file)
+			                   for data_file in data_files]
+
+			# Scan every containing directory once instead of stat()ing each file individually
+			present = {}
+			for data_file_path in data_file_paths:
+				dirname = path.dirname(data_file_path) or '.'
+				if dirname not in present:
+					try:
+						present[dirname] = {entry.name for entry in scandir(dirname) if entry.is_file()}
+					except FileNotFoundError:
+						present[dirname] = set()
+
+			missing = [data_file_path for data_file_path in data_file_paths
+			           if path.basename(data_file_path) not in present[path.dirname(data_file_path) or '.']]
+			if missing:
+				raise RuntimeError("Missing initial data file(s): {}".format(', '.join(missing)))
 
 		# Assert all required vars are accounted for
 		for var in config.getlist('job', 'required_vars'):
@@ -70,8 +95,8 @@ class Job(ABC):
 				raise RuntimeError("Missing value for variable '{}'".format(var))
 
 		self.static_vars = dict(config['static_vars'])
-		# Get dict of dynamic vars
-		self.dyn_vars = {var: config.getlist('dyn_vars', var) for var in config['dyn_vars']}
+		# Get dict of dynamic vars. Walk the section's items once instead of dispatching getlist() per key
+		self.dyn_vars = {var: values.split() for var, values in config['dyn_vars'].items()}
 		self.lammps_command = ' '.join([
 			config['lammps'].get('MPI_path'),
 			config['lammps'].get('MPI_arguments', ''),
@@ -84,18 +109,18 @@ class Job(ABC):
 		self.initial_data_file_prefix = config['job'].get('initial_data_file_prefix')
 		self.jobscript_header_file = config['lammps'].get('jobscript_header_file')
 
-		# Create Cartesian product of dynamic var values. Returns flat list of tuples (*vars)
-		dyn_values_list = list(product(*self.dyn_vars.values()))
+		# Create Cartesian product of dynamic var values. Yields tuples (*vars) lazily
+		dyn_values_iter = product(*self.dyn_vars.values())
+		num_simulations = reduce(mul, (len(values) for values in self.dyn_vars.values()), 1)
 
-		logging.info(datetime.now())
-		logging.info("Got {} simulations".format(len(dyn_values_list)))
+		logging.info("Got {} simulations".format(num_simulations))
 
-		self._spawn_simulations(dyn_values_list)
+		self._spawn_simulations(dyn_values_iter)
 
 	@abstractmethod
-	def _spawn_simulations(self, dyn_values_list: Sequence[Tuple]) -> None:
+	def _spawn_simulations(self, dyn_values_iter: Iterable[Tuple]) -> None:
 		"""
 		Dispatch simulations
-		:param dyn_values_list: List of tuples of values for the dynamic variables
+		:param dyn_values_iter: Iterable of tuples of values for the dynamic variables
 		"""
 		pass
@@ -2,10 +2,18 @@
 Exports the Simulation class.
 """
 
+import shlex
+from collections import deque
 from datetime import datetime
-from os import chdir, mkdir, path
+from os import makedirs, path
 from platform import uname
-from subprocess import run
+from subprocess import run, CompletedProcess, Popen, PIPE, STDOUT
+
+# Platform banner printed in verbose mode; computed once at import instead of per run() call
+_UNAME_STR = " ".join(uname())
+
+# Number of trailing LAMMPS output lines kept in log.tail when the full log is not kept
+_LOG_TAIL_LINES = 1000
 
 
 class Simulation:
@@ -16,7 +24,7 @@ class Simulation:
 	"""
 
 	def __init__(self, command: str, input_filename: str, log_filename: str, initial_data_file_prefix: str,
-	             dry_run: bool = False, verbose: bool = False, prefix: str = ""):
+	             dry_run: bool = False, verbose: bool = False, prefix: str = "", keep_log: bool = True):
 		"""
 		:param str  command: Command to run to call LAMMPS.
 		:param str  input_filename: Filename of the LAMMPS input file
@@ -24,30 +32,50 @@ class Simulation:
 		:param str  initial_data_file_prefix: Path to prepend to the initial data filename
 		:param bool dry_run: Doesn't do anything productive if true.
 		:param str  prefix:  String to prepend to all print() output.
+		:param bool keep_log: Keep only the last lines of LAMMPS stdout (in log.tail) instead of the full log file
+		                      if false.
 		"""
 		self.command = command
+		self._argv = shlex.split(command)
 		self.dry_run = dry_run
 		self.input_filename = input_filename
 		self.log_filename = log_filename
 		self.initial_data_file_prefix = initial_data_file_prefix
 		self.verbose = verbose
 		self.prefix = prefix
+		self.keep_log = keep_log
 
-	def _run_with_vars(self, input_filename: str, lmp_vars: dict = None) -> None:
+	def _run_with_vars(self, input_filename: str, lmp_vars: dict = None, cwd: str = '.') -> CompletedProcess:
 		"""
 		Run a LAMMPS simulation in a subprocess with variables.
 		:param str  input_filename: Filename of the LAMMPS input file
 		:param dict lmp_vars: Dictionary describing LAMMPS equal-style variables to set
+		:param str  cwd: Working directory to run the simulation in
+		:return: The CompletedProcess of the LAMMPS subprocess
 		"""
 		if lmp_vars is None:
 			lmp_vars = {}
 
-		with open(self.log_filename, 'w') as f:
-			cmd = self.command + ' -in {} '.format(input_filename) + ''.join(
-				['-var {} {} '.format(k, v) for k, v in lmp_vars.items()])
-			if self.verbose:
-				print("{} {}: Spawning LAMMPS:\n".format(self.prefix, datetime.now()) + cmd)
-			run(cmd, universal_newlines=True, stdout=f, shell=True)
+		argv = self._argv + ['-in', input_filename]
+		for k, v in lmp_vars.items():
+			argv += ['-var', k, str(v)]
+
+		if self.verbose:
+			print("{} {}: Spawning LAMMPS:\n".format(self.prefix, datetime.now()) + ' '.join(argv))
+
+		if self.keep_log:
+			with open(path.join(cwd, self.log_filename), 'w') as f:
+				return run(argv, universal_newlines=True, stdout=f, cwd=cwd)
+		else:
+			# Keep only the tail of LAMMPS stdout in a bounded buffer, so crashes leave diagnostics in log.tail
+			# without the disk and memory cost of the full log
+			tail = deque(maxlen=_LOG_TAIL_LINES)
+			with Popen(argv, universal_newlines=True, stdout=PIPE, stderr=STDOUT, cwd=cwd) as p:
+				for line in p.stdout:
+					tail.append(line)
+			with open(path.join(cwd, 'log.tail'), 'w') as f:
+				f.writelines(tail)
+			return CompletedProcess(argv, p.returncode)
 
 	def _run_in_subdir(self, subdir: str, lmp_vars: dict = None) -> None:
 		"""
@@ -58,27 +86,30 @@ class Simulation:
 		if lmp_vars is None:
 			lmp_vars = {}
 
-		# Create a subdirectory for every simulation. Skip simulation entirely if dir already exists
-		if not path.isdir(subdir):
+		# Create a subdirectory for every simulation. Skip only if a sentinel marks it as finished: a bare existing
+		# dir may belong to a simulation that is still running (or crashed) in a parallel sweep
+		done_file = path.join(subdir, '.done')
+		if not path.exists(done_file):
 			print("{} {}: Simulating {}...".format(self.prefix, datetime.now(), subdir))
 			if not self.dry_run:
-				mkdir(subdir)
-				chdir(subdir)
+				makedirs(subdir, exist_ok=True)
 
 				# Add prefix
 				lmp_vars['initial_data_file'] = self.initial_data_file_prefix + lmp_vars['initial_data_file']
 
-				# Modify paths to files in parent directories
+				# Modify paths to files in parent directories (LAMMPS resolves them relative to the subdir)
 				if not path.isabs(path.expanduser(lmp_vars['initial_data_file'])):
 					lmp_vars['initial_data_file'] = '../' + lmp_vars['initial_data_file']
 
 				input_filename = '../' + self.input_filename
 
-				self._run_with_vars(input_filename, lmp_vars)
-				chdir('../')
+				cp = self._run_with_vars(input_filename, lmp_vars, cwd=subdir)
+				if cp.returncode == 0:
+					open(done_file, 'w').close()
 				print("{} {}: Finished {}.".format(self.prefix, datetime.now(), subdir))
 		else:
-			print("{} {}: Found existing subdir {}. Skipping.".format(self.prefix, datetime.now(), subdir))
+			print("{} {}: Found finished simulation in subdir {}. Skipping.".format(self.prefix, datetime.now(),
+			                                                                        subdir))
 
 	def run(self, static_vars: dict = None, dyn_vars: dict = None) -> None:
 		"""
@@ -92,7 +123,7 @@ class Simulation:
 			dyn_vars = {}
 
 		if self.verbose:
-			print(" ".join(uname()))
+			print(_UNAME_STR)
 
 		subdir = 'grid' + ''.join([f'_{k}{v}' if type(v) == str else f'_{k}{float(v):.4f}' for k, v in dyn_vars.items()])
 
@@ -1,5 +1,7 @@
 """
-Deserialise variables passed as CLI arguments and instantiate and run a Simulation
+Look up simulation variables in a JSON manifest and instantiate and run a Simulation.
+
+Expects the path to the manifest and the index of the dynamic vars combination to run as CLI arguments.
 """
 
 from sys import argv
@@ -7,13 +9,11 @@ import json
 
 from Simulation import Simulation
 
-lammps_command = json.loads(argv[1])
-input_filename = json.loads(argv[2])
-log_filename = json.loads(argv[3])
-initial_data_file_prefix = json.loads(argv[4])
-dry_run = json.loads(argv[5])
-static_vars = json.loads(argv[6])
-dyn_vars = json.loads(argv[7])
+with open(argv[1]) as f:
+	manifest = json.load(f)
+
+dyn_vars = manifest['dyn_vars_list'][int(argv[2])]
 
-sim = Simulation(lammps_command, input_filename, log_filename, initial_data_file_prefix, dry_run, True)
-sim.run(static_vars, dyn_vars)
+sim = Simulation(manifest['lammps_command'], manifest['input_filename'], manifest['log_filename'],
+                 manifest['initial_data_file_prefix'], manifest['dry_run'], True)
+sim.run(manifest['static_vars'], dyn_vars)
@@ -3,7 +3,8 @@
 """
 Run a simulation job (a range of simulations with some arbitrary specified parameters) on a SLURM-enabled system.
 
-Simulations are submitted to SLURM using an ephemeral jobscript.
+Simulations are submitted to SLURM as a single array job using an ephemeral jobscript; every array task runs one
+combination of the dynamic variables, looked up in a JSON manifest by its task ID.
 
 Specify the sbatch command including arguments in settings.ini (slurm_sbatch_args)
 
@@ -15,7 +16,7 @@ run in parallel.
 import json
 import logging
 from subprocess import run, PIPE, STDOUT
-from typing import Sequence, Tuple
+from typing import Iterable, Tuple
 from os import path
 
 from Job import Job
@@ -26,39 +27,50 @@ class SlurmJob(Job):
 	Extends Job and implements _spawn_simulations() to submit SLURM jobs using sbatch.
 	"""
 
-	def _spawn_simulations(self, dyn_values_list: Sequence[Tuple]) -> None:
-		for dyn_values in dyn_values_list:
-			# Reconstruct dynamic vars dict
-			dyn_vars = dict(zip(self.dyn_vars.keys(), dyn_values))
-
-			# Get directory containing Lampshade
-			dir_lampshade = path.dirname(path.realpath(__file__))
-
-			# Read jobscript header from file
-			if path.isfile('../' + self.jobscript_header_file):
-				fn = '../' + self.jobscript_header_file
-			else:
-				fn = dir_lampshade + '/jobscript_header.sh'
-
-			# Build jobscript
-			with open(fn, 'r') as f:
-				jobscript = f.read()
-
-			jobscript += f"/usr/bin/env python3 {dir_lampshade}/run_simulation.py '{json.dumps(self.lammps_command)}' " \
-			             f"'{json.dumps(self.input_file)}' '{json.dumps(self.log_file)}' " \
-			             f"'{json.dumps(self.initial_data_file_prefix)}' '{json.dumps(self.args.dry_run)}' " \
-			             f"'{json.dumps(self.static_vars)}' '{json.dumps(dyn_vars)}'"
-
-			cp = run(self.slurm_sbatch_cmd, input=jobscript, universal_newlines=True, shell=True, stdout=PIPE,
-			         stderr=STDOUT)
-
-			logging.info(cp.stdout)
-
-			if cp.returncode == 0:
-				logging.info(f"Successfully submitted SLURM job with {self.slurm_sbatch_cmd}:\n"
-				             f"Jobscript: {jobscript}\n"
-				             f"Static vars: {self.static_vars}\n"
-				             f"Dynamic vars: {dyn_vars}\n")
+	def _spawn_simulations(self, dyn_values_iter: Iterable[Tuple]) -> None:
+		# Get directory containing Lampshade
+		dir_lampshade = path.dirname(path.realpath(__file__))
+
+		# Read jobscript header from file once; it is identical for every simulation
+		if path.isfile('../' + self.jobscript_header_file):
+			fn = '../' + self.jobscript_header_file
+		else:
+			fn = dir_lampshade + '/jobscript_header.sh'
+
+		with open(fn, 'r') as f:
+			jobscript_header = f.read()
+
+		# Reconstruct dynamic vars dicts. Materialized here because the manifest needs all combinations anyway
+		dyn_vars_list = [dict(zip(self.dyn_vars.keys(), dyn_values)) for dyn_values in dyn_values_iter]
+
+		# Serialise all simulation parameters into a JSON manifest; every array task indexes into dyn_vars_list
+		manifest = {
+			'lammps_command':           self.lammps_command,
+			'input_filename':           self.input_file,
+			'log_filename':             self.log_file,
+			'initial_data_file_prefix': self.initial_data_file_prefix,
+			'dry_run':                  self.args.dry_run,
+			'static_vars':              self.static_vars,
+			'dyn_vars_list':            dyn_vars_list,
+		}
+		with open('manifest.json', 'w') as f:
+			json.dump(manifest, f)
+
+		# Build jobscript: every array task runs the dynamic vars combination selected by its task ID
+		jobscript = jobscript_header
+		jobscript += f"/usr/bin/env python3 {dir_lampshade}/run_simulation.py manifest.json $SLURM_ARRAY_TASK_ID"
+
+		# Submit all simulations as a single array job: one sbatch round-trip instead of one per simulation
+		sbatch_cmd = f"{self.slurm_sbatch_cmd} --array=0-{len(dyn_vars_list) - 1}"
+		cp = run(sbatch_cmd, input=jobscript, universal_newlines=True, shell=True, stdout=PIPE, stderr=STDOUT)
+
+		logging.info(cp.stdout)
+
+		if cp.returncode == 0:
+			logging.info(f"Successfully submitted SLURM array job with {sbatch_cmd}:\n"
+			             f"Jobscript: {jobscript}\n"
+			             f"Static vars: {self.static_vars}\n"
+			             f"Dynamic vars: {dyn_vars_list}\n")
 
 
 job = SlurmJob(description=__doc__)